@@ -12,13 +12,7 @@ import adsk.fusion
 from .core import (
     make_joints,
     make_links,
-    write_control_launch,
-    write_gazebo_launch,
-    write_gazebo_xacro,
-    write_materials_xacro,
-    write_transmissions_xacro,
-    write_urdf_xacro,
-    write_yaml,
+    write_package_files,
 )
 from .utils import (
     UrdfInfo,
@@ -26,6 +20,7 @@ from .utils import (
     export_stl,
     file_dialog,
     make_package_structure,
+    remove_package_dir,
 )
 
 """
@@ -68,10 +63,7 @@ def run(context):
             return
 
         # --------------------
-        # get user's download folder by default
-        # home = os.path.expanduser("~")
-        # download_dir = os.path.join(home, "Downloads")
-        # save_dir = os.path.join(download_dir, "assets")
+        # ask the user where to save the package
         save_dir = file_dialog(ui)
 
         if not save_dir:
@@ -101,12 +93,9 @@ def run(context):
                 ui.messageBox("Fusion2URDF was canceled", title)
                 return 0
             elif result == adsk.core.DialogResults.DialogYes:  # type: ignore
-                import shutil
-
-                shutil.rmtree(package_dir)
-                ui.messageBox(
-                    f"Removed '{package_dir}' folder, continue with export.", title
-                )
+                remove_package_dir(str(package_dir))
+                # reported in the final summary instead of an extra modal dialog
+                msg += f"\nReplaced the existing folder '{package_dir}'."
 
         urdf_infos: UrdfInfo = {
             "robot_name": robot_name,
@@ -124,24 +113,21 @@ def run(context):
         # create package directory
         make_package_structure(urdf_infos)
 
+        # Walk the assembly tree once; every Fusion collection access is a
+        # round-trip into the host application.
+        occurrences = list(root.allOccurrences)
+
         # Generate links
-        urdf_infos["links"] = make_links(root, urdf_infos)
+        urdf_infos["links"] = make_links(occurrences, urdf_infos)
         # Generate joints_dict. All joints are related to root.
         urdf_infos["joints"] = make_joints(root)
 
         # write files
-        write_urdf_xacro(urdf_infos)
-        write_materials_xacro(urdf_infos)
-        write_transmissions_xacro(urdf_infos)
-        write_gazebo_xacro(urdf_infos)
-        # write_display_launch(urdf_infos)
-        write_gazebo_launch(urdf_infos)
-        write_control_launch(urdf_infos)
-        write_yaml(urdf_infos)
+        write_package_files(urdf_infos)
 
         # copy over package files
         create_package(urdf_infos, package_type)
-        export_stl(design, urdf_infos)
+        export_stl(design, urdf_infos, occurrences)
 
         ui.messageBox(msg, title)
 
@@ -9,18 +9,55 @@ Created on Sun May 12 20:17:17 2019
 @modified by: haoyan.li
 """
 
+from collections.abc import Callable, Sequence
 from enum import Enum
 from typing import Any, Optional
-from xml.etree.ElementTree import Element, SubElement
 
 # pyright: reportMissingImports=false
 import adsk
 import adsk.core
 import adsk.fusion
 
-from ..utils import convert_occ_name, utils
+from ..utils import convert_occ_name, escape_attr
 from ..utils.math_utils import Transform
 
+# Unit axis vectors indexed by Fusion's X/Y/Z direction values, shared by all joints
+_AXES: tuple[tuple[int, int, int], ...] = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+
+# Pretty-printed <transmission> element; only the joint name varies
+_TRANSMISSION_TEMPLATE = """\
+<transmission name="{name}_tran">
+  <type>transmission_interface/SimpleTransmission</type>
+  <joint name="{name}">
+    <hardwareInterface>hardware_interface/EffortJointInterface</hardwareInterface>
+  </joint>
+  <actuator name="{name}_actr">
+    <hardwareInterface>hardware_interface/EffortJointInterface</hardwareInterface>
+    <mechanicalReduction>1</mechanicalReduction>
+  </actuator>
+</transmission>"""
+
+# Pretty-printed <joint> elements, one per URDF joint type. Fixed joints have no
+# axis or limit and continuous joints have no limit.
+_JOINT_HEAD = """\
+<joint name="{name}" type="{type}">
+  <origin xyz="{xyz}" rpy="{rpy}" />
+  <parent link="{parent}" />
+  <child link="{child}" />
+"""
+_JOINT_AXIS = """\
+  <axis xyz="{axis}" />
+"""
+_JOINT_LIMIT = """\
+  <limit upper="{upper}" lower="{lower}" effort="100" velocity="100" />
+"""
+_JOINT_TEMPLATES: dict[str, str] = {
+    "fixed": _JOINT_HEAD + "</joint>",
+    "continuous": _JOINT_HEAD + _JOINT_AXIS + "</joint>",
+    "revolute": _JOINT_HEAD + _JOINT_AXIS + _JOINT_LIMIT + "</joint>",
+    "prismatic": _JOINT_HEAD + _JOINT_AXIS + _JOINT_LIMIT + "</joint>",
+}
+
 
 class Joint:
     """Represents a URDF joint with all necessary properties.
@@ -44,11 +81,31 @@ class Joint:
         tran_xml: Generated URDF XML for the transmission (set by make_transmission_xml)
     """
 
+    __slots__ = (
+        "_axis_str",
+        "_lower_str",
+        "_rpy_str",
+        "_upper_str",
+        "_xyz_str",
+        "axis",
+        "child",
+        "joint_xml",
+        "lower_limit",
+        "name",
+        "origin",
+        "parent",
+        "rpy",
+        "tran_xml",
+        "type",
+        "upper_limit",
+        "xyz",
+    )
+
     def __init__(
         self,
         name: str,
         origin: Transform,
-        axis: list[float],
+        axis: Sequence[float],
         parent: str,
         child: str,
         joint_type: str,
@@ -74,19 +131,28 @@ class Joint:
         self.child: str = child
         self.joint_xml: Optional[str] = None
         self.tran_xml: Optional[str] = None
-        self.axis: list[float] = axis  # for 'revolute' and 'continuous'
+        self.axis: Sequence[float] = axis  # for 'revolute' and 'continuous'
         self.upper_limit: float = upper_limit  # for 'revolute' and 'prismatic'
         self.lower_limit: float = lower_limit  # for 'revolute' and 'prismatic'
 
-        self.xyz: list[float] = origin.translation
-        self.rpy: list[float] = origin.rotation
+        self.xyz: tuple[float, ...] = tuple(origin.translation)
+        self.rpy: tuple[float, ...] = tuple(origin.rotation)
+
+        # URDF attribute strings are formatted once here so that make_joint_xml
+        # only assembles elements; fixed-point formatting rounds in a single step
+        # and keeps the output stable
+        self._xyz_str: str = "{:.6f} {:.6f} {:.6f}".format(*self.xyz)
+        self._rpy_str: str = "{:.6f} {:.6f} {:.6f}".format(*self.rpy)
+        self._axis_str: str = "{:g} {:g} {:g}".format(*axis)
+        self._upper_str: str = f"{upper_limit:.6f}"
+        self._lower_str: str = f"{lower_limit:.6f}"
 
     def make_joint_xml(self) -> list[str]:
         """Generate URDF XML representation of the joint.
 
         Creates a complete URDF joint element with origin, parent/child links,
         axis (for non-fixed joints), and limits (for revolute/prismatic joints).
-        The generated XML is stored in self.joint_xml and returned.
+        The generated XML is stored in self.joint_xml and reused by later calls.
 
         Returns:
             list[str]: Complete URDF XML string for the joint
@@ -94,41 +160,33 @@ class Joint:
         Note:
             The XML includes effort and velocity limits set to default values of 100.
         """
-        joint = Element("joint")
-        joint.attrib = {"name": self.name, "type": self.type}
-
-        origin = SubElement(joint, "origin")
-        origin.attrib = {
-            "xyz": " ".join([str(round(el, 6)) for el in self.xyz]),
-            "rpy": " ".join([str(round(el, 6)) for el in self.rpy]),
-        }
-        parent = SubElement(joint, "parent")
-        parent.attrib = {"link": self.parent}
-        child = SubElement(joint, "child")
-        child.attrib = {"link": self.child}
-        if (
-            self.type == "revolute"
-            or self.type == "continuous"
-            or self.type == "prismatic"
-        ):
-            axis = SubElement(joint, "axis")
-            axis.attrib = {"xyz": " ".join([str(round(el, 6)) for el in self.axis])}
-        if self.type == "revolute" or self.type == "prismatic":
-            limit = SubElement(joint, "limit")
-            limit.attrib = {
-                "upper": str(round(self.upper_limit, 6)),
-                "lower": str(round(self.lower_limit, 6)),
-                "effort": "100",
-                "velocity": "100",
-            }
-        if self.type == "fixed":
-            # fixed joint does not have axis and limit
-            pass
-
-        lines = utils.prettify(joint).split("\n")[1:]
-        self.joint_xml = "\n".join(lines)
-
-        return lines
+        return self.to_xml().split("\n")
+
+    def to_xml(self) -> str:
+        """Return the URDF joint element, rendering it on first use.
+
+        The rendered element is stored in self.joint_xml and shared with
+        make_joint_xml.
+
+        Returns:
+            str: URDF <joint> element
+        """
+        # joints are not modified after construction, so the XML is rendered once
+        # from the template of its type instead of building an element tree
+        if self.joint_xml is None:
+            self.joint_xml = _JOINT_TEMPLATES[self.type].format(
+                name=escape_attr(self.name),
+                type=self.type,
+                xyz=self._xyz_str,
+                rpy=self._rpy_str,
+                parent=escape_attr(self.parent),
+                child=escape_attr(self.child),
+                axis=self._axis_str,
+                upper=self._upper_str,
+                lower=self._lower_str,
+            )
+
+        return self.joint_xml
 
     def make_transmission_xml(self) -> list[str]:
         """Generate URDF XML representation of the joint transmission.
@@ -144,30 +202,24 @@ class Joint:
             - Transmission type: transmission_interface/SimpleTransmission
             - Hardware interface: hardware_interface/EffortJointInterface
             - Mechanical reduction: 1 (no reduction)
+            - Only the joint name varies, so the XML is rendered from a constant
+              template instead of building an element tree per joint
         """
+        return self.transmission_to_xml().split("\n")
 
-        tran = Element("transmission")
-        tran.attrib = {"name": self.name + "_tran"}
+    def transmission_to_xml(self) -> str:
+        """Return the URDF transmission element, rendering it on first use.
 
-        joint_type = SubElement(tran, "type")
-        joint_type.text = "transmission_interface/SimpleTransmission"
+        The rendered element is stored in self.tran_xml and shared with
+        make_transmission_xml.
 
-        joint = SubElement(tran, "joint")
-        joint.attrib = {"name": self.name}
-        hardwareInterface_joint = SubElement(joint, "hardwareInterface")
-        hardwareInterface_joint.text = "hardware_interface/EffortJointInterface"
-
-        actuator = SubElement(tran, "actuator")
-        actuator.attrib = {"name": self.name + "_actr"}
-        hardwareInterface_actr = SubElement(actuator, "hardwareInterface")
-        hardwareInterface_actr.text = "hardware_interface/EffortJointInterface"
-        mechanicalReduction = SubElement(actuator, "mechanicalReduction")
-        mechanicalReduction.text = "1"
-
-        lines = utils.prettify(tran).split("\n")[1:]
-        self.tran_xml = "\n".join(lines)
+        Returns:
+            str: URDF <transmission> element
+        """
+        if self.tran_xml is None:
+            self.tran_xml = _TRANSMISSION_TEMPLATE.format(name=escape_attr(self.name))
 
-        return lines
+        return self.tran_xml
 
 
 class JointTypes(Enum):
@@ -191,6 +243,81 @@ class JointTypes(Enum):
     INFERRED = 7
 
 
+def _get_axis_from_direction(
+    direction: int, joint_name: str, axis_type: str
+) -> tuple[int, int, int]:
+    """Convert direction index to axis vector."""
+    if 0 <= direction < len(_AXES):
+        return _AXES[direction]
+    raise ValueError(
+        f"{joint_name} has no {axis_type} axis set. Please set it and try again."
+    )
+
+
+def _process_revolute_joint(
+    motion: Any, fusion_joint_name: str
+) -> tuple[str, Sequence[float], float, float]:
+    """Process revolute joint and return type, axis, and limits."""
+    rotation_axis: int = motion.rotationAxis
+    axis = _get_axis_from_direction(rotation_axis, fusion_joint_name, "rotation")
+
+    # every property read is a call into Fusion, so read each limit flag once
+    limits = motion.rotationLimits
+    max_enabled = limits.isMaximumValueEnabled
+    min_enabled = limits.isMinimumValueEnabled
+
+    if max_enabled and min_enabled:
+        joint_type = "revolute"
+        upper_limit = limits.maximumValue
+        lower_limit = limits.minimumValue
+    elif not max_enabled and not min_enabled:
+        joint_type = "continuous"
+        upper_limit = 0.0
+        lower_limit = 0.0
+    else:
+        raise ValueError(
+            f"{fusion_joint_name} has incomplete angle limits. Please set both or neither."
+        )
+
+    return joint_type, axis, upper_limit, lower_limit
+
+
+def _process_prismatic_joint(
+    motion: Any, fusion_joint_name: str
+) -> tuple[str, Sequence[float], float, float]:
+    """Process prismatic joint and return type, axis, and limits."""
+    slide_direction: int = motion.slideDirection
+    axis = _get_axis_from_direction(
+        slide_direction, fusion_joint_name, "slide direction"
+    )
+
+    limits = motion.slideLimits
+    upper_limit = 0.0
+    lower_limit = 0.0
+    if limits.isMaximumValueEnabled and limits.isMinimumValueEnabled:
+        upper_limit = limits.maximumValue
+        lower_limit = limits.minimumValue
+
+    return "prismatic", axis, upper_limit, lower_limit
+
+
+def _process_rigid_joint(
+    motion: Any, fusion_joint_name: str
+) -> tuple[str, Sequence[float], float, float]:
+    """Process rigid joint, which is exported as a URDF fixed joint."""
+    return "fixed", (0.0, 0.0, 0.0), 0.0, 0.0
+
+
+# Per-type joint processors keyed by Fusion's jointType value, built once at import
+_JOINT_HANDLERS: dict[
+    int, Callable[[Any, str], tuple[str, Sequence[float], float, float]]
+] = {
+    JointTypes.RIGID.value: _process_rigid_joint,
+    JointTypes.REVOLUTE.value: _process_revolute_joint,
+    JointTypes.SLIDER.value: _process_prismatic_joint,
+}
+
+
 def make_joints(
     root: adsk.fusion.Component,
 ) -> dict[str, Joint]:
@@ -203,78 +330,34 @@ def make_joints(
     Raises:
         ValueError: If joint origins are not properly set, if joint axis/direction is not set, if angle limits are incomplete, or if an unsupported joint type is encountered.
     Notes:
-        - Only revolute, prismatic (slider), and rigid joints are processed. Rigid joints are skipped.
+        - Only revolute, prismatic (slider), and rigid joints are processed. Rigid joints are exported as fixed joints.
         - Joint origins and axes are extracted and transformed to the parent link frame.
-        - Joint limits are rounded to six decimal places.
+        - Joint limits are rounded to six decimal places when the XML attributes are
+          formatted in Joint.__init__; the stored values are left unrounded.
     """
-
-    def get_axis_from_direction(
-        direction: int, joint_name: str, axis_type: str
-    ) -> list[float]:
-        """Convert direction index to axis vector."""
-        if direction == 0:  # X axis
-            return [1, 0, 0]
-        elif direction == 1:  # Y axis
-            return [0, 1, 0]
-        elif direction == 2:  # Z axis
-            return [0, 0, 1]
-        else:
-            raise ValueError(
-                f"{joint_name} has no {axis_type} axis set. Please set it and try again."
-            )
-
-    def process_revolute_joint(
-        motion: Any, fusion_joint_name: str
-    ) -> tuple[str, list[float], float, float]:
-        """Process revolute joint and return type, axis, and limits."""
-        axis = get_axis_from_direction(
-            motion.rotationAxis, fusion_joint_name, "rotation"
-        )
-
-        if (
-            motion.rotationLimits.isMaximumValueEnabled
-            and motion.rotationLimits.isMinimumValueEnabled
-        ):
-            joint_type = "revolute"
-            upper_limit = round(motion.rotationLimits.maximumValue, 6)
-            lower_limit = round(motion.rotationLimits.minimumValue, 6)
-        elif (
-            not motion.rotationLimits.isMaximumValueEnabled
-            and not motion.rotationLimits.isMinimumValueEnabled
-        ):
-            joint_type = "continuous"
-            upper_limit = 0.0
-            lower_limit = 0.0
-        else:
-            raise ValueError(
-                f"{fusion_joint_name} has incomplete angle limits. Please set both or neither."
-            )
-
-        return joint_type, axis, upper_limit, lower_limit
-
-    def process_prismatic_joint(
-        motion: Any, fusion_joint_name: str
-    ) -> tuple[str, list[float], float, float]:
-        """Process prismatic joint and return type, axis, and limits."""
-        axis = get_axis_from_direction(
-            motion.slideDirection, fusion_joint_name, "slide direction"
-        )
-
-        upper_limit = 0.0
-        lower_limit = 0.0
-        if (
-            motion.slideLimits.isMaximumValueEnabled
-            and motion.slideLimits.isMinimumValueEnabled
-        ):
-            upper_limit = round(motion.slideLimits.maximumValue, 6)
-            lower_limit = round(motion.slideLimits.minimumValue, 6)
-
-        return "prismatic", axis, upper_limit, lower_limit
-
     all_joints: list[adsk.fusion.Joint] = root.allJoints
     joints: dict[str, Joint] = {}
 
+    # per-occurrence transforms keyed by fullPathName, which is unique and stable
+    # for an occurrence during the export; the Fusion API hands out a new wrapper
+    # object on every access, so id() cannot be used as the key, and entityToken
+    # is only meant for findEntityByToken and may differ between calls
+    parent_inverse_cache: dict[str, Transform] = {}
+    child_transform_cache: dict[str, Transform] = {}
+    # converted link names, keyed the same way; saves both the occ.name round-trip
+    # and the suffix regex for occurrences shared by several joints
+    occ_name_cache: dict[str, str] = {}
+
+    def name_of(occ: adsk.fusion.Occurrence, key: str) -> str:
+        name = occ_name_cache.get(key)
+        if name is None:
+            name = convert_occ_name(occ.name)
+            occ_name_cache[key] = name
+        return name
+
     for fusion_joint in all_joints:
+        # read once; the name is used by every error message and the Joint itself
+        joint_name = fusion_joint.name
         child_occ = fusion_joint.occurrenceOne
         parent_occ = fusion_joint.occurrenceTwo
 
@@ -285,53 +368,47 @@ def make_joints(
             child_joint_origin, adsk.fusion.JointOrigin
         ) or not isinstance(parent_joint_origin, adsk.fusion.JointOrigin):
             raise ValueError(
-                f"{fusion_joint.name} joint origins are not properly set. Please set them and try again."
+                f"{joint_name} joint origins are not properly set. Please set them and try again."
             )
 
         motion: Any = fusion_joint.jointMotion
         fusion_joint_type = motion.jointType
 
-        # Process rigid joints to generate fixed joints in URDF
-        if fusion_joint_type == JointTypes.RIGID.value:
-            joint_type = "fixed"
-            axis = [0.0] * 3
-            joint_upper_limit = 0.0
-            joint_lower_limit = 0.0
-        elif fusion_joint_type == JointTypes.REVOLUTE.value:
-            # Process joint based on type
-            joint_type, axis, joint_upper_limit, joint_lower_limit = (
-                process_revolute_joint(motion, fusion_joint.name)
-            )
-        elif fusion_joint_type == JointTypes.SLIDER.value:
-            joint_type, axis, joint_upper_limit, joint_lower_limit = (
-                process_prismatic_joint(motion, fusion_joint.name)
-            )
-        else:
+        handler = _JOINT_HANDLERS.get(fusion_joint_type)
+        if handler is None:
             raise ValueError(
-                f"{fusion_joint.name} has unsupported joint type. Only Revolute, Rigid and Slider are supported."
+                f"{joint_name} has unsupported joint type. Only Revolute, Rigid and Slider are supported."
             )
+        joint_type, axis, joint_upper_limit, joint_lower_limit = handler(
+            motion, joint_name
+        )
 
         # calculate the origin of the joint
-        # wMpl: world to parent link
-        wMpl = Transform.from_Matrix3D(parent_occ.transform2)
+        # plMw: parent link to world, i.e. the inverse of wMpl (world to parent
+        # link). A link is usually the parent of several joints, so it is cached.
+        parent_key = parent_occ.fullPathName
+        plMw = parent_inverse_cache.get(parent_key)
+        if plMw is None:
+            plMw = Transform.from_Matrix3D(parent_occ.transform2).inverse()
+            parent_inverse_cache[parent_key] = plMw
         # wMcl: world to child link
-        wMcl = Transform.from_Matrix3D(child_occ.transform2)
+        child_key = child_occ.fullPathName
+        wMcl = child_transform_cache.get(child_key)
+        if wMcl is None:
+            wMcl = Transform.from_Matrix3D(child_occ.transform2)
+            child_transform_cache[child_key] = wMcl
         # clMcj: child link to child joint origin
         clMcj = Transform.from_Matrix3D(child_joint_origin.transform)
-        # wMcj: world to child joint origin
-        wMcj = wMcl * clMcj
-        # origin = plMcj: parent link to child joint origin
-        origin = wMpl.inverse() * wMcj
-
-        parent_occ_name = convert_occ_name(parent_occ.name)
-        child_occ_name = convert_occ_name(child_occ.name)
+        # origin = plMcj = plMw * wMcl * clMcj: parent link to child joint origin,
+        # composed in one pass without intermediate Transform objects
+        origin = Transform.compose(plMw, wMcl, clMcj)
 
         joint = Joint(
-            name=fusion_joint.name,
+            name=joint_name,
             origin=origin,
             axis=axis,
-            parent=parent_occ_name,
-            child=child_occ_name,
+            parent=name_of(parent_occ, parent_key),
+            child=name_of(child_occ, child_key),
             joint_type=joint_type,
             upper_limit=joint_upper_limit,
             lower_limit=joint_lower_limit,
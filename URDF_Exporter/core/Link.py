@@ -10,17 +10,44 @@ Created on Sun May 12 20:11:28 2019
 @modified by: haoyan.li
 """
 
-from typing import Optional
-from xml.etree.ElementTree import Element, SubElement
+from collections.abc import Sequence
 
 # pyright: reportMissingImports=false
 import adsk
 import adsk.core
 import adsk.fusion
 
-from ..utils import convert_occ_name, prettify, origin2center_of_mass, UrdfInfo
+from ..utils import convert_occ_name, escape_attr, origin2center_of_mass, UrdfInfo
 from ..utils.math_utils import Transform
 
+# Link-to-joint-origin transform of links that have no "j_" joint origin
+_IDENTITY = Transform()
+
+# Pretty-printed <link> element. Only the name, mass properties and joint origin
+# offset vary; the mesh scale is fixed because STL files have no unit and Fusion
+# exports them in millimeters.
+_LINK_TEMPLATE = """\
+<link name="{name}">
+  <inertial>
+    <origin xyz="{com}" rpy="0 0 0" />
+    <mass value="{mass}" />
+    <inertia ixx="{ixx}" iyy="{iyy}" izz="{izz}" ixy="{ixy}" iyz="{iyz}" ixz="{ixz}" />
+  </inertial>
+  <visual>
+    <origin xyz="{xyz}" rpy="{rpy}" />
+    <geometry>
+      <mesh filename="{filename}" scale="0.001 0.001 0.001" />
+    </geometry>
+    <material name="silver" />
+  </visual>
+  <collision>
+    <origin xyz="{xyz}" rpy="{rpy}" />
+    <geometry>
+      <mesh filename="{filename}" scale="0.001 0.001 0.001" />
+    </geometry>
+  </collision>
+</link>"""
+
 
 class Link:
     """Represents a URDF link with mass properties and geometry information.
@@ -42,14 +69,25 @@ class Link:
         link_xml: Generated URDF XML for the link (set by make_link_xml)
     """
 
+    __slots__ = (
+        "center_of_mass",
+        "inertia_tensor",
+        "joMl",
+        "lMjo",
+        "link_xml",
+        "mass",
+        "name",
+        "repo",
+    )
+
     def __init__(
         self,
         name: str,
-        center_of_mass: list[float],
+        center_of_mass: Sequence[float],
         repo: str,
         mass: float,
-        inertia_tensor: list[float],
-        joint_origin_tf: Optional[adsk.core.Matrix3D] = None,
+        inertia_tensor: Sequence[float],
+        joint_origin_tf: adsk.core.Matrix3D | None = None,
     ) -> None:
         """Initialize a Link instance.
 
@@ -62,19 +100,46 @@ class Link:
             joint_origin_tf: Optional transformation matrix from link to joint origin
         """
         self.name: str = name
-        self.center_of_mass: list[float] = center_of_mass
-        self.link_xml: Optional[str] = None
+        self.center_of_mass: Sequence[float] = center_of_mass
+        self.link_xml: str | None = None
         self.repo: str = repo
         self.mass: float = mass
-        self.inertia_tensor: list[float] = inertia_tensor
-        self.lMjo: Transform = (
-            Transform.from_Matrix3D(joint_origin_tf) if joint_origin_tf else Transform()
-        )
-        self.joMl: Transform = self.lMjo.inverse()
+        self.inertia_tensor: Sequence[float] = inertia_tensor
+        if joint_origin_tf:
+            self.lMjo: Transform = Transform.from_Matrix3D(joint_origin_tf)
+            self.joMl: Transform = self.lMjo.inverse()
+        else:
+            # without a joint origin both frames coincide; share one identity
+            # instead of building and inverting a new transform per link
+            self.lMjo = _IDENTITY
+            self.joMl = _IDENTITY
 
     def make_link_xml(self) -> list[str]:
         """Generate URDF XML representation of the link.
 
+        The generated XML is stored in self.link_xml and reused by later calls.
+
+        Returns:
+            list[str]: Complete URDF XML string for the link
+        """
+        return self.to_xml().split("\n")
+
+    def to_xml(self) -> str:
+        """Return the URDF link element, rendering it on first use.
+
+        The rendered element is stored in self.link_xml and shared with
+        make_link_xml.
+
+        Returns:
+            str: URDF <link> element
+        """
+        if self.link_xml is None:
+            self.link_xml = self._render_xml()
+        return self.link_xml
+
+    def _render_xml(self) -> str:
+        """Render the pretty-printed URDF link element.
+
         Creates a complete URDF link element including:
         - Inertial properties (mass, center of mass, inertia tensor)
         - Visual geometry (STL mesh with silver material)
@@ -84,97 +149,99 @@ class Link:
         the joint origin and link origin using the joMl transformation.
 
         Returns:
-            list[str]: Complete URDF XML string for the link
+            str: URDF <link> element
 
         Note:
             STL meshes are scaled by 0.001 (assuming Fusion 360 export is in mm,
             converting to meters for URDF).
         """
-
-        link = Element("link")
-        link.attrib = {"name": self.name}
-
-        # inertial
-        inertial = SubElement(link, "inertial")
-        origin_i = SubElement(inertial, "origin")
-        origin_i.attrib = {
-            "xyz": " ".join([f"{round(el, 6)}" for el in self.center_of_mass]),
-            "rpy": "0 0 0",
-        }
-        mass = SubElement(inertial, "mass")
-        mass.attrib = {"value": f"{round(self.mass, 6)}"}
-        inertia = SubElement(inertial, "inertia")
-        inertia.attrib = {
-            "ixx": f"{round(self.inertia_tensor[0], 6)}",
-            "iyy": f"{round(self.inertia_tensor[1], 6)}",
-            "izz": f"{round(self.inertia_tensor[2], 6)}",
-            "ixy": f"{round(self.inertia_tensor[3], 6)}",
-            "iyz": f"{round(self.inertia_tensor[4], 6)}",
-            "ixz": f"{round(self.inertia_tensor[5], 6)}",
-        }
-
-        # STL file has no unit. We assume the export from Fusion 360 is in meters.
-        scale = 0.001
-        # visual
-        visual = SubElement(link, "visual")
-        origin_v = SubElement(visual, "origin")
+        name = escape_attr(self.name)
         # The urdf origin is at the joint origin, so use self.joMl to fix the visual and collision offset when there is an offset between the joint origin and the link origin.
-        origin_v.attrib = {
-            "xyz": " ".join([f"{round(el, 6)}" for el in self.joMl.translation]),
-            "rpy": " ".join([f"{round(el, 6)}" for el in self.joMl.rotation]),
-        }
-        geometry_v = SubElement(visual, "geometry")
-        mesh_v = SubElement(geometry_v, "mesh")
-        mesh_v.attrib = {
-            "filename": f"{self.repo}meshes/{self.name}.stl",
-            "scale": " ".join([str(scale)] * 3),
-        }
-        material = SubElement(visual, "material")
-        material.attrib = {"name": "silver"}
-
-        # collision
-        collision = SubElement(link, "collision")
-        origin_c = SubElement(collision, "origin")
-        origin_c.attrib = {
-            "xyz": " ".join([f"{round(el, 6)}" for el in self.joMl.translation]),
-            "rpy": " ".join([f"{round(el, 6)}" for el in self.joMl.rotation]),
-        }
-        # origin_c.attrib = {"xyz": " ".join([str(_) for _ in self.xyz]), "rpy": "0 0 0"}
-        geometry_c = SubElement(collision, "geometry")
-        mesh_c = SubElement(geometry_c, "mesh")
-        mesh_c.attrib = {
-            "filename": f"{self.repo}meshes/{self.name}.stl",
-            "scale": " ".join([str(scale)] * 3),
-        }
-
-        # print("\n".join(utils.prettify(link).split("\n")[1:]))
-        lines = prettify(link).split("\n")[1:]
-        self.link_xml = "\n".join(lines)
-        return lines
-
-
-def make_links(root: adsk.fusion.Component, urdf_infos: UrdfInfo) -> dict[str, Link]:
+        joMl = self.joMl
+        cx, cy, cz = self.center_of_mass
+        ixx, iyy, izz, ixy, iyz, ixz = self.inertia_tensor
+        x, y, z = joMl.translation
+        roll, pitch, yaw = joMl.rotation
+        # fixed-point formatting rounds in a single step and keeps the output stable
+        return _LINK_TEMPLATE.format(
+            name=name,
+            com=f"{cx:.6f} {cy:.6f} {cz:.6f}",
+            mass=f"{self.mass:.6f}",
+            ixx=f"{ixx:.6f}",
+            iyy=f"{iyy:.6f}",
+            izz=f"{izz:.6f}",
+            ixy=f"{ixy:.6f}",
+            iyz=f"{iyz:.6f}",
+            ixz=f"{ixz:.6f}",
+            xyz=f"{x:.6f} {y:.6f} {z:.6f}",
+            rpy=f"{roll:.6f} {pitch:.6f} {yaw:.6f}",
+            filename=f"{escape_attr(self.repo)}meshes/{name}.stl",
+        )
+
+
+def serialize_links(links: dict[str, Link]) -> str:
+    """Join the rendered URDF XML of all links into one block.
+
+    Args:
+        links: Dictionary mapping link names to Link objects
+
+    Returns:
+        str: Concatenated <link> elements
+    """
+    return "\n".join([link.to_xml() for link in links.values()])
+
+
+def make_links(
+    occurrences: list[adsk.fusion.Occurrence], urdf_infos: UrdfInfo
+) -> dict[str, Link]:
     """Create Link objects for all occurrences in a Fusion 360 component.
 
-    Processes all occurrences in the root component and creates corresponding
-    Link objects with extracted mass properties and geometry information.
+    Processes the given occurrences of the root component and creates
+    corresponding Link objects with extracted mass properties and geometry
+    information.
 
     Args:
-        root: Root Fusion 360 component containing all occurrences
+        occurrences: All occurrences of the root component, collected once by
+                     the caller so the assembly tree is not walked again
         urdf_infos: Dictionary containing URDF generation information including repo path
 
     Returns:
         dict[str, Link]: Dictionary mapping occurrence names to Link objects
     """
-    all_occurrences = root.allOccurrences
     repo = urdf_infos["repo"]
+    # instances of the same component share their joint origins, so the scan for
+    # the "j_" origin is done once per component, keyed by the persistent
+    # component id (entityToken may differ between reads of the same entity)
+    joint_origin_cache: dict[str, adsk.core.Matrix3D | None] = {}
 
-    links = {occ.name: make_link(occ, repo) for occ in all_occurrences}
+    links = {occ.name: make_link(occ, repo, joint_origin_cache) for occ in occurrences}
 
     return links
 
 
-def make_link(occ: adsk.fusion.Occurrence, repo: str) -> Link:
+def _find_joint_origin_transform(
+    component: adsk.fusion.Component,
+) -> adsk.core.Matrix3D | None:
+    """Find the transform of the component's "j_" joint origin.
+
+    Args:
+        component: Fusion 360 component to search
+
+    Returns:
+        adsk.core.Matrix3D | None: Transform of the only joint origin whose name
+        starts with "j_", or None if there is not exactly one
+    """
+    j = [jo for jo in component.jointOrigins if jo.name.startswith("j_")]
+    if len(j) != 1:
+        return None
+    return j[0].transform
+
+
+def make_link(
+    occ: adsk.fusion.Occurrence,
+    repo: str,
+    joint_origin_cache: dict[str, adsk.core.Matrix3D | None] | None = None,
+) -> Link:
     """Create a Link instance from a Fusion 360 occurrence.
 
     Extracts physical properties from the occurrence including mass, center of mass,
@@ -184,6 +251,9 @@ def make_link(occ: adsk.fusion.Occurrence, repo: str) -> Link:
     Args:
         occ: Fusion 360 occurrence to extract link data from
         repo: Repository path for mesh file references
+        joint_origin_cache: Optional joint origin transforms keyed by component id,
+                            shared across calls so that instances of the same
+                            component are only scanned once
 
     Returns:
         Link: Link instance with extracted properties
@@ -200,24 +270,37 @@ def make_link(occ: adsk.fusion.Occurrence, repo: str) -> Link:
         adsk.fusion.CalculationAccuracy.VeryHighCalculationAccuracy  # type: ignore
     )
     component = occ.component
-    all_joint_origins = component.jointOrigins
 
-    # find the joint origin whose name has the prefix "j_"
-    j = [jo for jo in all_joint_origins if jo.name.startswith("j_")]
-    if len(j) != 1:
-        print("Invalid number of joint origins in " + occ.name)
-    joint_origin = j[0] if len(j) == 1 else None
+    occ_name = occ.name
 
-    name = convert_occ_name(occ.name)
+    # find the joint origin whose name has the prefix "j_"
+    if joint_origin_cache is None:
+        joint_origin_tf = _find_joint_origin_transform(component)
+    else:
+        key = component.id
+        if key not in joint_origin_cache:
+            joint_origin_cache[key] = _find_joint_origin_transform(component)
+        joint_origin_tf = joint_origin_cache[key]
+    # warn for every affected occurrence, not only the first of its component
+    if joint_origin_tf is None:
+        print("Invalid number of joint origins in " + occ_name)
+
+    name = convert_occ_name(occ_name)
 
     mass = prop.mass  # kg
-    center_of_mass = [_ / 100.0 for _ in prop.centerOfMass.asArray()]  ## cm to m
+    cx, cy, cz = prop.centerOfMass.asArray()
+    center_of_mass = (cx / 100.0, cy / 100.0, cz / 100.0)  ## cm to m
 
     # https://help.autodesk.com/view/fusion360/ENU/?guid=GUID-ce341ee6-4490-11e5-b25b-f8b156d7cd97
     (_, xx, yy, zz, xy, yz, xz) = prop.getXYZMomentsOfInertia()
-    moment_inertia_world = [
-        _ / 10000.0 for _ in [xx, yy, zz, xy, yz, xz]
-    ]  ## kg / cm^2 -> kg/m^2
+    moment_inertia_world = (
+        xx / 10000.0,
+        yy / 10000.0,
+        zz / 10000.0,
+        xy / 10000.0,
+        yz / 10000.0,
+        xz / 10000.0,
+    )  ## kg / cm^2 -> kg/m^2
     inertia_tensor = origin2center_of_mass(moment_inertia_world, center_of_mass, mass)
 
     link = Link(
@@ -226,7 +309,7 @@ def make_link(occ: adsk.fusion.Occurrence, repo: str) -> Link:
         repo,
         mass,
         inertia_tensor,
-        joint_origin.transform if joint_origin else None,
+        joint_origin_tf,
     )
 
     return link
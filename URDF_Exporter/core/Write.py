@@ -7,18 +7,143 @@ Created on Sun May 12 20:46:26 2019
 """
 
 import os
-from xml.etree.ElementTree import Element, SubElement
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core import Joint, Link, serialize_links
+from ..utils.utils import escape_attr, prettify_xml_str, UrdfInfo
+
+# O_BINARY only exists on Windows, where it disables newline translation
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# Opening and closing of every xacro document. The documents are pretty-printed
+# before they are written, so no whitespace is needed between the two lines.
+_ROBOT_HEADER = (
+    '<?xml version="1.0" ?>'
+    '<robot name="{name}" xmlns:xacro="http://www.ros.org/wiki/xacro">'
+)
+_ROBOT_FOOTER = "</robot>"
+
+# Blocks of the .gazebo file. The whole document is pretty-printed before it is
+# written, so the blocks are kept on one line each.
+_GAZEBO_PLUGIN = (
+    "<gazebo>"
+    '<plugin name="control" filename="libgazebo_ros_control.so" />'
+    "</gazebo>"
+)
+_GAZEBO_BASE_LINK = (
+    '<gazebo reference="base_link">'
+    "  <material>${body_color}</material>"
+    "  <mu1>0.2</mu1>"
+    "  <mu2>0.2</mu2>"
+    "  <selfCollide>true</selfCollide>"
+    "  <gravity>true</gravity>"
+    "</gazebo>"
+)
+_GAZEBO_LINK_TEMPLATE = (
+    '<gazebo reference="{name}">'
+    "  <material>${{body_color}}</material>"
+    "  <mu1>0.2</mu1>"
+    "  <mu2>0.2</mu2>"
+    "  <selfCollide>true</selfCollide>"
+    "</gazebo>"
+)
+
+# controller.yaml: the joint state controller, then one stanza per non-fixed joint
+_YAML_HEADER_TEMPLATE = """\
+{controller_name}:
+  # Publish all joint states -----------------------------------
+  joint_state_controller:
+    type: joint_state_controller/JointStateController
+    publish_rate: 50
+
+  # Position Controllers --------------------------------------
+"""
+_YAML_JOINT_TEMPLATE = """\
+  {name}_position_controller:
+    type: effort_controllers/JointPositionController
+    joint: {name}
+    pid: {{p: 100.0, i: 0.01, d: 10.0}}
+"""
+
+# The ROS 1 launch files have a fixed shape, so they are rendered from templates
+# instead of building and pretty-printing an element tree. The templates keep the
+# minidom spelling ("/> and the trailing newline), so the files are unchanged.
+_DISPLAY_LAUNCH_TEMPLATE = """\
+<launch>
+  <arg name="model" default="$(find {package_name})/urdf/{robot_name}.xacro"/>
+  <arg name="gui" default="true"/>
+  <arg name="rvizconfig" default="$(find {package_name})/launch/urdf.rviz"/>
+  <param name="robot_description" command="$(find xacro)/xacro $(arg model)"/>
+  <param name="use_gui" value="$(arg gui)"/>
+  <node name="joint_state_publisher_gui" pkg="joint_state_publisher_gui" type="joint_state_publisher_gui"/>
+  <node name="robot_state_publisher" pkg="robot_state_publisher" type="robot_state_publisher"/>
+  <node name="rviz" pkg="rviz" args="-d $(arg rvizconfig)" type="rviz" required="true"/>
+</launch>
+"""
+
+_GAZEBO_LAUNCH_TEMPLATE = """\
+<launch>
+  <param name="robot_description" command="$(find xacro)/xacro $(find {package_name})/urdf/{robot_name}.xacro"/>
+  <node name="spawn_urdf" pkg="gazebo_ros" type="spawn_model" args="-param robot_description -urdf -model {robot_name}"/>
+  <include file="$(find gazebo_ros)/launch/empty_world.launch">
+    <arg name="paused" value="true"/>
+    <arg name="use_sim_time" value="true"/>
+    <arg name="gui" value="true"/>
+    <arg name="headless" value="false"/>
+    <arg name="debug" value="false"/>
+  </include>
+</launch>
+"""
+
+_CONTROL_LAUNCH_TEMPLATE = """\
+<node name="controller_spawner" pkg="controller_manager" type="spawner" respawn="false" output="screen" ns="{robot_name}" args="{controller_args}"/>
+<node name="robot_state_publisher" pkg="robot_state_publisher" type="robot_state_publisher" respawn="false" output="screen">
+  <remap from="/joint_states" to="/{robot_name}/joint_states"/>
+</node>
+"""
+
+
+def _write_file(file_name: str, content: str) -> None:
+    """Write generated file content to disk with unbuffered writes.
+
+    The content is encoded as UTF-8 and written in binary mode, so line endings
+    stay LF on every platform instead of being translated to CRLF on Windows.
+    The whole file is encoded up front, so it goes straight to the descriptor
+    without an intermediate Python file buffer.
+
+    Args:
+        file_name: Full path of the file to create or overwrite
+        content: Complete text of the file
+    """
+    data = memoryview(content.encode("utf-8"))
+    # 0o666 masked by the umask, the same mode open() creates files with
+    fd = os.open(file_name, _WRITE_FLAGS, 0o666)
+    try:
+        # os.write may write less than requested, e.g. when interrupted
+        while data:
+            data = data[os.write(fd, data) :]
+    finally:
+        os.close(fd)
+
 
-from ..core import Joint, Link
-from ..utils import utils
-from ..utils.utils import prettify_xml_str, UrdfInfo
+def _movable_joints(joints: dict[str, Joint]) -> list[Joint]:
+    """Return the non-fixed joints of the robot.
+
+    Args:
+        joints: Dictionary mapping joint names to Joint objects
+
+    Returns:
+        list[Joint]: Non-fixed joints in joint order
+    """
+    return [joint for joint in joints.values() if joint.type != "fixed"]
 
 
 def write_link_urdf(links: dict[str, Link]) -> list[str]:
     """Write link definitions to a URDF file.
 
     Appends URDF XML representations of all provided links to the specified file.
-    Each link's XML is generated using its make_link_xml() method.
+    Each link element is rendered once from the link template, and
+    serialize_links() joins them into a single block.
 
     Args:
         file_name: Full path to the URDF file to append to
@@ -27,11 +152,7 @@ def write_link_urdf(links: dict[str, Link]) -> list[str]:
     Note:
         File must already exist and be opened in append mode.
     """
-    lines = []
-    for link in links.values():
-        lines.extend(link.make_link_xml())
-
-    return lines
+    return [serialize_links(links)]
 
 
 def write_joint_urdf(joints: dict[str, Joint]) -> list[str]:
@@ -39,7 +160,7 @@ def write_joint_urdf(joints: dict[str, Joint]) -> list[str]:
 
     Appends URDF XML representations of all provided joints and their
     corresponding transmissions to the specified file. Each joint's XML
-    is generated using its make_joint_xml() and make_transmission_xml() methods.
+    comes from the string cached by its to_xml() method.
 
     Args:
         file_name: Full path to the URDF file to append to
@@ -50,7 +171,7 @@ def write_joint_urdf(joints: dict[str, Joint]) -> list[str]:
     """
     lines = []
     for joint in joints.values():
-        lines.extend(joint.make_joint_xml())
+        lines.append(joint.to_xml())
 
     return lines
 
@@ -63,7 +184,7 @@ def write_endtag(robot_name: str) -> list[str]:
     Args:
         file_name: Full path to the URDF file to append to
     """
-    return ["</xacro:macro>\n", f"<!-- <xacro:{robot_name} /> -->\n", "</robot>\n"]
+    return ["</xacro:macro>\n", f"<!-- <xacro:{robot_name} /> -->\n", _ROBOT_FOOTER]
 
 
 def write_urdf_xacro(urdf_infos: UrdfInfo) -> None:
@@ -92,8 +213,7 @@ def write_urdf_xacro(urdf_infos: UrdfInfo) -> None:
     file_name = os.path.join(urdf_dir, f"{robot_name}.urdf.xacro")
 
     lines = [
-        f'<?xml version="1.0" ?>',
-        f'<robot name="{robot_name}" xmlns:xacro="http://www.ros.org/wiki/xacro">',
+        _ROBOT_HEADER.format(name=robot_name),
         f'<xacro:macro name="{robot_name}" params="">',
         f'<xacro:include filename="$(find {package_name})/urdf/materials.xacro" />',
         f'<xacro:include filename="$(find {package_name})/urdf/{robot_name}.trans" />',
@@ -104,10 +224,7 @@ def write_urdf_xacro(urdf_infos: UrdfInfo) -> None:
     lines.extend(write_joint_urdf(joints))
     lines.extend(write_endtag(robot_name))
 
-    with open(file_name, mode="w") as f:
-        pretty_xml = prettify_xml_str("".join(lines))
-
-        f.write(pretty_xml)
+    _write_file(file_name, prettify_xml_str("".join(lines)))
 
 
 def write_materials_xacro(urdf_infos: UrdfInfo) -> None:
@@ -125,22 +242,21 @@ def write_materials_xacro(urdf_infos: UrdfInfo) -> None:
     file_name = os.path.join(urdf_dir, "materials.xacro")  # the name of urdf file
 
     lines = [
-        '<?xml version="1.0" ?>',
-        f'<robot name="{robot_name}" xmlns:xacro="http://www.ros.org/wiki/xacro" >',
+        _ROBOT_HEADER.format(name=robot_name),
         "",
         '<material name="silver">',
         '  <color rgba="0.700 0.700 0.700 1.000"/>',
         "</material>",
         "",
-        "</robot>",
+        _ROBOT_FOOTER,
     ]
 
-    with open(file_name, mode="w") as f:
-        pretty_xml = prettify_xml_str("".join(lines))
-        f.write(pretty_xml)
+    _write_file(file_name, prettify_xml_str("".join(lines)))
 
 
-def write_transmissions_xacro(urdf_infos: UrdfInfo) -> None:
+def write_transmissions_xacro(
+    urdf_infos: UrdfInfo, movable_joints: list[Joint] | None = None
+) -> None:
     """Generate transmission XACRO file for ros_control integration.
 
     Creates a XACRO file containing transmission definitions for all non-fixed joints.
@@ -149,6 +265,8 @@ def write_transmissions_xacro(urdf_infos: UrdfInfo) -> None:
     Args:
         urdf_infos: Dictionary containing URDF generation parameters including
                    robot_name, urdf_dir, and joints
+        movable_joints: Non-fixed joints, when already filtered by the caller;
+                        collected from urdf_infos["joints"] if omitted
 
     Note:
         Only processes joints with type != "fixed" to avoid unnecessary transmissions
@@ -156,23 +274,22 @@ def write_transmissions_xacro(urdf_infos: UrdfInfo) -> None:
     """
     robot_name = urdf_infos["robot_name"]
     urdf_dir = urdf_infos["urdf_dir"]
-    joints: dict[str, Joint] = urdf_infos["joints"]
+    if movable_joints is None:
+        movable_joints = _movable_joints(urdf_infos["joints"])
     file_name = os.path.join(urdf_dir, f"{robot_name}.trans")  # the name of urdf file
 
     lines = [
-        '<?xml version="1.0" ?>',
-        f'<robot name="{robot_name}" xmlns:xacro="http://www.ros.org/wiki/xacro" >',
+        _ROBOT_HEADER.format(name=robot_name),
         "",
-        f"</robot>",
     ]
 
-    for _, j in joints.items():
-        if j.type != "fixed":
-            lines.insert(-1, "\n".join(j.make_transmission_xml()))
+    # append and close afterwards; inserting before the end tag shifts the list
+    for j in movable_joints:
+        lines.append(j.transmission_to_xml())
+
+    lines.append(_ROBOT_FOOTER)
 
-    with open(file_name, mode="w") as f:
-        pretty_xml = prettify_xml_str("".join(lines))
-        f.write(pretty_xml)
+    _write_file(file_name, prettify_xml_str("".join(lines)))
 
 
 def write_gazebo_xacro(urdf_infos: UrdfInfo) -> None:
@@ -198,50 +315,23 @@ def write_gazebo_xacro(urdf_infos: UrdfInfo) -> None:
     file_name = os.path.join(urdf_dir, f"{robot_name}.gazebo")  # the name of urdf file
 
     lines = [
-        '<?xml version="1.0" ?>',
-        f'<robot name="{robot_name}" xmlns:xacro="http://www.ros.org/wiki/xacro" >',
+        _ROBOT_HEADER.format(name=robot_name),
         '<xacro:property name="body_color" value="Gazebo/Silver" />',
     ]
 
-    gazebo = Element("gazebo")
-    plugin = SubElement(gazebo, "plugin")
-    plugin.attrib = {"name": "control", "filename": "libgazebo_ros_control.so"}
-    gazebo_xml = "\n".join(utils.prettify(gazebo).split("\n")[1:])
-
-    lines.append(gazebo_xml)
+    lines.append(_GAZEBO_PLUGIN)
 
     # for base_link
-    baselink_lines = [
-        '<gazebo reference="base_link">',
-        f"  <material>${{body_color}}</material>",
-        "  <mu1>0.2</mu1>",
-        "  <mu2>0.2</mu2>",
-        "  <selfCollide>true</selfCollide>",
-        "  <gravity>true</gravity>",
-        "</gazebo>",
-        "",
-    ]
-    lines.extend(baselink_lines)
+    lines.append(_GAZEBO_BASE_LINK)
 
     # others
-    for joint_name, joint in joints.items():
-        joint_lines = [
-            f'<gazebo reference="{joint.child}">',
-            f"  <material>${{body_color}}</material>",
-            "  <mu1>0.2</mu1>",
-            "  <mu2>0.2</mu2>",
-            "  <selfCollide>true</selfCollide>",
-            "</gazebo>",
-            "",
-        ]
-        lines.extend(joint_lines)
+    for joint in joints.values():
+        lines.append(_GAZEBO_LINK_TEMPLATE.format(name=escape_attr(joint.child)))
 
     # end tag
-    lines.append("</robot>")
+    lines.append(_ROBOT_FOOTER)
 
-    with open(file_name, mode="w") as f:
-        pretty_xml = prettify_xml_str("".join(lines))
-        f.write(pretty_xml)
+    _write_file(file_name, prettify_xml_str("".join(lines)))
 
 
 def write_display_launch(urdf_infos: UrdfInfo) -> None:
@@ -263,60 +353,13 @@ def write_display_launch(urdf_infos: UrdfInfo) -> None:
     robot_name = urdf_infos["robot_name"]
     launch_dir = urdf_infos["launch_dir"]
 
-    launch = Element("launch")
-
-    arg1 = SubElement(launch, "arg")
-    arg1.attrib = {
-        "name": "model",
-        "default": f"$(find {package_name})/urdf/{robot_name}.xacro",
-    }
-
-    arg2 = SubElement(launch, "arg")
-    arg2.attrib = {"name": "gui", "default": "true"}
-
-    arg3 = SubElement(launch, "arg")
-    arg3.attrib = {
-        "name": "rvizconfig",
-        "default": f"$(find {package_name})/launch/urdf.rviz",
-    }
-
-    param1 = SubElement(launch, "param")
-    param1.attrib = {
-        "name": "robot_description",
-        "command": "$(find xacro)/xacro $(arg model)",
-    }
-
-    param2 = SubElement(launch, "param")
-    param2.attrib = {"name": "use_gui", "value": "$(arg gui)"}
-
-    node1 = SubElement(launch, "node")
-    node1.attrib = {
-        "name": "joint_state_publisher_gui",
-        "pkg": "joint_state_publisher_gui",
-        "type": "joint_state_publisher_gui",
-    }
-
-    node2 = SubElement(launch, "node")
-    node2.attrib = {
-        "name": "robot_state_publisher",
-        "pkg": "robot_state_publisher",
-        "type": "robot_state_publisher",
-    }
-
-    node3 = SubElement(launch, "node")
-    node3.attrib = {
-        "name": "rviz",
-        "pkg": "rviz",
-        "args": "-d $(arg rvizconfig)",
-        "type": "rviz",
-        "required": "true",
-    }
-
-    launch_xml = "\n".join(utils.prettify(launch).split("\n")[1:])
+    launch_xml = _DISPLAY_LAUNCH_TEMPLATE.format(
+        package_name=escape_attr(package_name),
+        robot_name=escape_attr(robot_name),
+    )
 
     file_name = f"{launch_dir}/display.launch"
-    with open(file_name, mode="w") as f:
-        f.write(launch_xml)
+    _write_file(file_name, launch_xml)
 
 
 def write_gazebo_launch(urdf_infos: UrdfInfo) -> None:
@@ -338,49 +381,18 @@ def write_gazebo_launch(urdf_infos: UrdfInfo) -> None:
     robot_name = urdf_infos["robot_name"]
     launch_dir = urdf_infos["launch_dir"]
 
-    launch = Element("launch")
-    param = SubElement(launch, "param")
-    param.attrib = {
-        "name": "robot_description",
-        "command": f"$(find xacro)/xacro $(find {package_name})/urdf/{robot_name}.xacro",
-    }
-
-    node = SubElement(launch, "node")
-    node.attrib = {
-        "name": "spawn_urdf",
-        "pkg": "gazebo_ros",
-        "type": "spawn_model",
-        "args": f"-param robot_description -urdf -model {robot_name}",
-    }
-
-    include_ = SubElement(launch, "include")
-    include_.attrib = {"file": "$(find gazebo_ros)/launch/empty_world.launch"}
-
-    number_of_args = 5
-    args = [None for i in range(number_of_args)]
-    args_name_value_pairs = [
-        ["paused", "true"],
-        ["use_sim_time", "true"],
-        ["gui", "true"],
-        ["headless", "false"],
-        ["debug", "false"],
-    ]
-
-    for i, arg in enumerate(args):
-        arg = SubElement(include_, "arg")
-        arg.attrib = {
-            "name": args_name_value_pairs[i][0],
-            "value": args_name_value_pairs[i][1],
-        }
-
-    launch_xml = "\n".join(utils.prettify(launch).split("\n")[1:])
+    launch_xml = _GAZEBO_LAUNCH_TEMPLATE.format(
+        package_name=escape_attr(package_name),
+        robot_name=escape_attr(robot_name),
+    )
 
     file_name = f"{launch_dir}/gazebo.launch"
-    with open(file_name, mode="w") as f:
-        f.write(launch_xml)
+    _write_file(file_name, launch_xml)
 
 
-def write_control_launch(urdf_infos: UrdfInfo) -> None:
+def write_control_launch(
+    urdf_infos: UrdfInfo, movable_joints: list[Joint] | None = None
+) -> None:
     """Generate ROS launch file for robot control.
 
     Creates a launch file that starts ros_control controllers for all non-fixed joints
@@ -390,6 +402,8 @@ def write_control_launch(urdf_infos: UrdfInfo) -> None:
     Args:
         urdf_infos: Dictionary containing URDF generation parameters including
                    package_name, robot_name, joints, and launch_dir
+        movable_joints: Non-fixed joints, when already filtered by the caller;
+                        collected from urdf_infos["joints"] if omitted
 
     Note:
         - Creates position controllers for all non-fixed joints
@@ -398,60 +412,35 @@ def write_control_launch(urdf_infos: UrdfInfo) -> None:
     """
     package_name = urdf_infos["package_name"]
     robot_name = urdf_infos["robot_name"]
-    joints: dict[str, Joint] = urdf_infos["joints"]
     launch_dir = urdf_infos["launch_dir"]
+    if movable_joints is None:
+        movable_joints = _movable_joints(urdf_infos["joints"])
     # rosparam = SubElement(launch, 'rosparam')
     # rosparam.attrib = {'file':'$(find {})/launch/controller.yaml'.format(package_name),
     #                   'command':'load'}
 
-    controller_args_str = ""
-    for j_name, j in joints.items():
-        joint_type = j.type
-        if joint_type != "fixed":
-            controller_args_str += f"{j.name}_position_controller "
-    controller_args_str += "joint_state_controller "
-
-    node_controller = Element("node")
-    node_controller.attrib = {
-        "name": "controller_spawner",
-        "pkg": "controller_manager",
-        "type": "spawner",
-        "respawn": "false",
-        "output": "screen",
-        "ns": robot_name,
-        "args": f"{controller_args_str}",
-    }
-
-    node_publisher = Element("node")
-    node_publisher.attrib = {
-        "name": "robot_state_publisher",
-        "pkg": "robot_state_publisher",
-        "type": "robot_state_publisher",
-        "respawn": "false",
-        "output": "screen",
-    }
-    remap = SubElement(node_publisher, "remap")
-    remap.attrib = {"from": "/joint_states", "to": f"/{robot_name}/joint_states"}
-
-    # launch_xml  = "\n".join(utils.prettify(launch).split("\n")[1:])
-    launch_xml = "\n".join(utils.prettify(node_controller).split("\n")[1:])
-    launch_xml += "\n".join(utils.prettify(node_publisher).split("\n")[1:])
+    controller_args = [f"{j.name}_position_controller " for j in movable_joints]
+    controller_args.append("joint_state_controller ")
+    controller_args_str = "".join(controller_args)
+
+    launch_xml = _CONTROL_LAUNCH_TEMPLATE.format(
+        robot_name=escape_attr(robot_name),
+        controller_args=escape_attr(controller_args_str),
+    )
 
     file_name = f"{launch_dir}/controller.launch"
-    with open(file_name, mode="w") as f:
-        f.write("<launch>\n")
-        f.write("\n")
+    lines = [
+        "<launch>",
+        "",
         # for some reason ROS is very picky about the attribute ordering, so we'll bitbang this element
-        f.write(
-            f'<rosparam file="$(find {package_name})/launch/controller.yaml" command="load"/>'
-        )
-        f.write("\n")
-        f.write(launch_xml)
-        f.write("\n")
-        f.write("</launch>")
+        f'<rosparam file="$(find {package_name})/launch/controller.yaml" command="load"/>',
+        launch_xml,
+        "</launch>",
+    ]
+    _write_file(file_name, "\n".join(lines))
 
 
-def write_yaml(urdf_infos: UrdfInfo) -> None:
+def write_yaml(urdf_infos: UrdfInfo, movable_joints: list[Joint] | None = None) -> None:
     """Generate YAML configuration file for ros_control controllers.
 
     Creates a YAML file defining controller configurations including:
@@ -461,30 +450,63 @@ def write_yaml(urdf_infos: UrdfInfo) -> None:
     Args:
         urdf_infos: Dictionary containing URDF generation parameters including
                    robot_name, joints, and launch_dir
+        movable_joints: Non-fixed joints, when already filtered by the caller;
+                        collected from urdf_infos["joints"] if omitted
 
     Note:
         Uses default PID values (P=100.0, I=0.01, D=10.0) for all position
         controllers. Joint state controller publishes at 50 Hz.
     """
     robot_name = urdf_infos["robot_name"]
-    joints: dict[str, Joint] = urdf_infos["joints"]
     launch_dir = urdf_infos["launch_dir"]
+    if movable_joints is None:
+        movable_joints = _movable_joints(urdf_infos["joints"])
 
     controller_name = f"{robot_name}_controller"
     file_name = f"{launch_dir}/controller.yaml"
-    with open(file_name, "w") as f:
-        f.write(f"{controller_name}:\n")
-        # joint_state_controller
-        f.write("  # Publish all joint states -----------------------------------\n")
-        f.write("  joint_state_controller:\n")
-        f.write("    type: joint_state_controller/JointStateController\n")
-        f.write("    publish_rate: 50\n\n")
-        # position_controllers
-        f.write("  # Position Controllers --------------------------------------\n")
-        for joint_name, joint in joints.items():
-            joint_type = joint.type
-            if joint_type != "fixed":
-                f.write(f"  {joint.name}_position_controller:\n")
-                f.write(f"    type: effort_controllers/JointPositionController\n")
-                f.write(f"    joint: {joint.name}\n")
-                f.write(f"    pid: {{p: 100.0, i: 0.01, d: 10.0}}\n")
+
+    parts = [_YAML_HEADER_TEMPLATE.format(controller_name=controller_name)]
+    parts.extend(
+        _YAML_JOINT_TEMPLATE.format(name=joint.name) for joint in movable_joints
+    )
+
+    # the file is small, so render it fully and write it in one call
+    _write_file(file_name, "".join(parts))
+
+
+def write_package_files(urdf_infos: UrdfInfo) -> None:
+    """Generate every URDF, XACRO, launch and controller file of the package.
+
+    The writers are independent functions of urdf_infos that each write their own
+    file, so they are run concurrently on a thread pool and overlap their file I/O.
+
+    Args:
+        urdf_infos: Dictionary containing all URDF generation parameters including
+                   the generated joints and links
+
+    Raises:
+        Exception: Re-raises the first error raised by any of the writers
+
+    Note:
+        The RViz display launch file is not written here; it is provided by the
+        package templates copied in create_package.
+    """
+    # the transmission, controller launch and controller yaml writers only handle
+    # actuated joints, so the filter is applied once and passed to all of them
+    movable_joints = _movable_joints(urdf_infos["joints"])
+
+    tasks = (
+        (write_urdf_xacro, urdf_infos),
+        (write_materials_xacro, urdf_infos),
+        (write_transmissions_xacro, urdf_infos, movable_joints),
+        (write_gazebo_xacro, urdf_infos),
+        (write_gazebo_launch, urdf_infos),
+        (write_control_launch, urdf_infos, movable_joints),
+        (write_yaml, urdf_infos, movable_joints),
+    )
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(*task) for task in tasks]
+
+    # surface writer errors to the caller instead of dropping them with the future
+    for future in futures:
+        future.result()
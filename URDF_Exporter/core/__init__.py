@@ -1,4 +1,4 @@
-from .Link import Link, make_links
+from .Link import Link, make_links, serialize_links
 from .Joint import Joint, make_joints
 from .Write import (
     write_urdf_xacro,
@@ -9,6 +9,7 @@ from .Write import (
     write_gazebo_launch,
     write_control_launch,
     write_yaml,
+    write_package_files,
 )
 
 __all__ = [
@@ -17,6 +18,7 @@ __all__ = [
     "make_joints",
     "write_urdf_xacro",
     "make_links",
+    "serialize_links",
     "write_materials_xacro",
     "write_transmissions_xacro",
     "write_gazebo_xacro",
@@ -24,4 +26,5 @@ __all__ = [
     "write_gazebo_launch",
     "write_control_launch",
     "write_yaml",
+    "write_package_files",
 ]
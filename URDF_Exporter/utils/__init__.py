@@ -11,9 +11,11 @@ Modules:
 from .math_utils import Transform
 from .utils import (
     convert_occ_name,
+    escape_attr,
     export_stl,
     file_dialog,
     make_package_structure,
+    remove_package_dir,
     create_package,
     prettify,
     prettify_xml_str,
@@ -24,9 +26,11 @@ from .utils import (
 __all__ = [
     "Transform",
     "convert_occ_name",
+    "escape_attr",
     "export_stl",
     "file_dialog",
     "make_package_structure",
+    "remove_package_dir",
     "create_package",
     "prettify",
     "prettify_xml_str",
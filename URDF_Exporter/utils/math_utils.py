@@ -125,7 +125,7 @@ class Transform:
         Returns:
             list[list[float]]: 3x3 rotation matrix representing the orientation
         """
-        return [row[:3] for row in self.as_matrix()[:3]]
+        return [row[:3] for row in self.homogeneous[:3]]
 
     @staticmethod
     def from_Matrix3D(matrix3d: adsk.core.Matrix3D) -> "Transform":
@@ -146,38 +146,17 @@ class Transform:
             - Extracts Euler angles from rotation matrix using ZYX convention
             - Handles gimbal lock singularities in angle extraction
         """
-        flatten_mat = list(matrix3d.asArray())
-
-        # reshape to 4x4
-        mat = [[0.0 for _ in range(4)] for _ in range(4)]
-        for i in range(4):
-            for j in range(4):
-                mat[i][j] = flatten_mat[i * 4 + j]
+        # asArray returns all 16 row-major cells in a single Fusion call
+        m = matrix3d.asArray()
 
         # Convert units from cm to m, specifically for matrix3d from Fusion 360
-        tx = mat[0][3] / 100.0  # cm to m
-        ty = mat[1][3] / 100.0  # cm to m
-        tz = mat[2][3] / 100.0  # cm to m
-
-        # Extract rotation matrix
-        R = [
-            [mat[0][0], mat[0][1], mat[0][2]],
-            [mat[1][0], mat[1][1], mat[1][2]],
-            [mat[2][0], mat[2][1], mat[2][2]],
+        mat = [
+            [m[0], m[1], m[2], m[3] / 100.0],
+            [m[4], m[5], m[6], m[7] / 100.0],
+            [m[8], m[9], m[10], m[11] / 100.0],
+            [m[12], m[13], m[14], m[15]],
         ]
-
-        # Extract Euler angles (roll, pitch, yaw)
-        sy = math.sqrt(R[0][0] ** 2 + R[1][0] ** 2)
-        singular = sy < 1e-6
-        if not singular:
-            roll = math.atan2(R[2][1], R[2][2])
-            pitch = math.atan2(-R[2][0], sy)
-            yaw = math.atan2(R[1][0], R[0][0])
-        else:
-            roll = math.atan2(-R[1][2], R[1][1])
-            pitch = math.atan2(-R[2][0], sy)
-            yaw = 0
-        return Transform([tx, ty, tz], [roll, pitch, yaw])
+        return Transform.from_matrix(mat)
 
     @staticmethod
     def from_matrix(matrix: list[list[float]]) -> "Transform":
@@ -238,9 +217,30 @@ class Transform:
         Note:
             Matrix multiplication order: result = self.matrix @ other.matrix
         """
-        mat1 = self.as_matrix()
-        mat2 = other.as_matrix()
-        result = mat_mult(mat1, mat2)
+        result = mat_mult(self.homogeneous, other.homogeneous)
+        return Transform.from_matrix(result)
+
+    @staticmethod
+    def compose(*transforms: "Transform") -> "Transform":
+        """Compose a chain of transformations into a single Transform.
+
+        Equivalent to transforms[0] * transforms[1] * ... but multiplies the
+        cached homogeneous matrices directly and only decomposes the final product,
+        instead of creating an intermediate Transform (and re-deriving its matrix
+        from Euler angles) for every step of the chain.
+
+        Args:
+            *transforms: Transforms to compose, outermost frame first
+
+        Returns:
+            Transform: Composed transformation of the whole chain
+
+        Example:
+            >>> origin = Transform.compose(plMw, wMcl, clMcj)  # plMcj
+        """
+        result = transforms[0].homogeneous
+        for transform in transforms[1:]:
+            result = mat_mult(result, transform.homogeneous)
         return Transform.from_matrix(result)
 
     def inverse(self) -> "Transform":
@@ -255,9 +255,10 @@ class Transform:
 
         Note:
             Uses efficient inverse computation for rigid body transformations:
-            R_inv = R^T, t_inv = -R^T * t
+            R_inv = R^T, t_inv = -R^T * t, applied to the cached homogeneous
+            matrix instead of rebuilding it from the Euler angles
         """
-        inv_mat = mat_inverse_4x4(self.as_matrix())
+        inv_mat = mat_inverse_4x4(self.homogeneous)
         return Transform.from_matrix(inv_mat)
 
 
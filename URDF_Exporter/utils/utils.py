@@ -15,13 +15,17 @@ Created on Sun May 12 19:15:34 2019
 """
 
 import fileinput
+import functools
 import os.path
 import re
 import shutil
 import sys
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, TypedDict
 from xml.dom import minidom
 from xml.etree import ElementTree
+from xml.sax.saxutils import escape
 
 # pyright: reportMissingImports=false
 import adsk
@@ -33,6 +37,12 @@ if TYPE_CHECKING:
     from ..core.Joint import Joint
     from ..core.Link import Link
 
+# Version suffix Fusion appends to occurrence names, e.g. the ":1" in "wheel:1"
+_OCC_SUFFIX_RE = re.compile(r":[0-9]+$")
+
+# Extra entities needed to escape text used inside a double-quoted attribute
+_ATTR_ENTITIES = {'"': "&quot;"}
+
 
 class UrdfInfo(TypedDict):
     """Type definition for URDF generation information dictionary.
@@ -65,6 +75,7 @@ class UrdfInfo(TypedDict):
     links: "dict[str, Link]"
 
 
+@functools.cache
 def convert_occ_name(occ_name: str) -> str:
     """Convert Fusion 360 occurrence name to valid URDF link/joint name.
 
@@ -82,11 +93,34 @@ def convert_occ_name(occ_name: str) -> str:
         "wheel"
         >>> convert_occ_name("base_link:2")
         "base_link"
+
+    Note:
+        Results are memoized; the same occurrence name is converted for its link
+        and again for every joint that references it.
+    """
+    # The pattern is xxx:1, find the ":1" part and remove it; sub is a no-op when
+    # there is no suffix, so no separate search is needed
+    return _OCC_SUFFIX_RE.sub("", occ_name)
+
+
+@functools.cache
+def escape_attr(value: str) -> str:
+    """Escape text for use inside a double-quoted XML attribute.
+
+    Escapes "&", "<", ">" and '"' the same way ElementTree does for attribute
+    values.
+
+    Args:
+        value: Raw attribute text, e.g. a link or joint name
+
+    Returns:
+        str: Escaped attribute text
+
+    Note:
+        Results are memoized; the same link and joint names are interpolated
+        into many generated files.
     """
-    # The pattern is xxx:1, find the ":1" part and remove it
-    if re.search(":[0-9]+$", occ_name):
-        occ_name = re.sub(":[0-9]+$", "", occ_name)
-    return occ_name
+    return escape(value, _ATTR_ENTITIES)
 
 
 def make_package_structure(urdf_infos: UrdfInfo) -> None:
@@ -105,38 +139,40 @@ def make_package_structure(urdf_infos: UrdfInfo) -> None:
         Creates directories recursively if they don't exist. Safe to call
         multiple times - will not overwrite existing directories.
     """
-    package_dir = urdf_infos["package_dir"]
     meshes_dir = urdf_infos["meshes_dir"]
     urdf_dir = urdf_infos["urdf_dir"]
     launch_dir = urdf_infos["launch_dir"]
 
-    if not os.path.exists(package_dir):
-        os.makedirs(package_dir)
-    if not os.path.exists(meshes_dir):
-        os.makedirs(meshes_dir)
-    if not os.path.exists(urdf_dir):
-        os.makedirs(urdf_dir)
-    if not os.path.exists(launch_dir):
-        os.makedirs(launch_dir)
+    # makedirs creates package_dir on the way, and exist_ok avoids a separate
+    # existence check per directory
+    for directory in (meshes_dir, urdf_dir, launch_dir):
+        os.makedirs(directory, exist_ok=True)
 
 
 def export_stl(
     design: adsk.fusion.Design,
     urdf_infos: UrdfInfo,
+    occurrences: list[adsk.fusion.Occurrence],
 ) -> None:
     """Export STL mesh files for all occurrences in a Fusion 360 design.
 
     Processes all occurrences in the design's root component and exports each
-    as an STL file to the meshes directory. Uses low mesh refinement for faster
-    export and smaller file sizes suitable for robotics applications.
+    distinct component once as an STL file to the meshes directory. Uses low
+    mesh refinement for faster export and smaller file sizes suitable for
+    robotics applications.
 
     Args:
         design: Fusion 360 design object containing the robot model
         urdf_infos: Dictionary containing mesh directory path and other info
+        occurrences: All occurrences of the design's root component
 
     Note:
-        - Exports in ASCII STL format (not binary)
+        - Exports in binary STL format, which is several times smaller than ASCII
         - Uses MeshRefinementLow for performance
+        - Mesh files are named after the component, so occurrences sharing a
+          component reuse the same file instead of being tessellated again
+        - Exports run serially because the Fusion API must be called from the
+          main thread
         - Prints progress and error messages to console
         - Skips components that cannot be exported due to errors
     """
@@ -146,26 +182,54 @@ def export_stl(
     meshes_dir = urdf_infos["meshes_dir"]
 
     # export the occurrence one by one in the component to a specified file
-    occurrences = design.rootComponent.allOccurrences
+    exported: set[str] = set()
 
     for occ in occurrences:
+        component = occ.component
+        component_name = component.name
+        if component_name in exported:
+            continue
+        exported.add(component_name)
+
         try:
-            print(occ.component.name)
-            fileName = meshes_dir + "/" + occ.component.name
+            fileName = meshes_dir + "/" + component_name
             # create stl exportOptions
-            stlExportOptions = exportMgr.createSTLExportOptions(occ.component, fileName)
+            stlExportOptions = exportMgr.createSTLExportOptions(component, fileName)
             stlExportOptions.sendToPrintUtility = False
             stlExportOptions.isBinaryFormat = True
             # options are .MeshRefinementLow .MeshRefinementMedium .MeshRefinementHigh
             stlExportOptions.meshRefinement = (
                 adsk.fusion.MeshRefinementSettings.MeshRefinementLow  # type: ignore
             )
-            print("Exporting " + occ.component.name + " to " + fileName)
-            print(f"Unit: {stlExportOptions.unitType}")
+            print("Exporting " + component_name + " to " + fileName)
 
             exportMgr.execute(stlExportOptions)
         except Exception:
-            print("Component " + occ.component.name + " has something wrong.")
+            print("Component " + component_name + " has something wrong.")
+
+
+def remove_package_dir(package_dir: str) -> None:
+    """Remove a previously generated package directory and all its files.
+
+    Files are unlinked concurrently on a thread pool before the remaining empty
+    directory tree is removed. Packages of large assemblies contain many mesh
+    files, and deleting them one after another is slow on Windows, where every
+    unlink is also inspected by the virus scanner.
+
+    Args:
+        package_dir: Path to the package directory to remove
+    """
+    files = [
+        os.path.join(dir_path, file_name)
+        for dir_path, _, file_names in os.walk(package_dir)
+        for file_name in file_names
+    ]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # list() re-raises the first failed unlink
+        list(executor.map(os.remove, files))
+
+    # only empty directories are left at this point
+    shutil.rmtree(package_dir)
 
 
 def file_dialog(ui: adsk.core.UserInterface) -> str | bool:
@@ -193,7 +257,7 @@ def file_dialog(ui: adsk.core.UserInterface) -> str | bool:
 
 
 def origin2center_of_mass(
-    inertia: list[float], center_of_mass: list[float], mass: float
+    inertia: Sequence[float], center_of_mass: Sequence[float], mass: float
 ) -> list[float]:
     """Transform inertia tensor from world origin to center of mass frame.
 
@@ -213,10 +277,12 @@ def origin2center_of_mass(
         Uses the parallel axis theorem: I_cm = I_origin - m * d²
         where d is the distance from origin to center of mass.
     """
-    x = center_of_mass[0]
-    y = center_of_mass[1]
-    z = center_of_mass[2]
-    translation_matrix = [y**2 + z**2, x**2 + z**2, x**2 + y**2, -x * y, -y * z, -x * z]
+    x, y, z = center_of_mass
+    # square each coordinate once; every diagonal term uses two of them
+    xx = x * x
+    yy = y * y
+    zz = z * z
+    translation_matrix = [yy + zz, xx + zz, xx + yy, -x * y, -y * z, -x * z]
     return [round(i - mass * t, 6) for i, t in zip(inertia, translation_matrix)]
 
 
@@ -233,11 +299,14 @@ def prettify(elem: ElementTree.Element) -> str:
         str: Pretty-printed XML string with 2-space indentation
 
     Note:
-        Uses UTF-8 encoding and 2-space indentation for consistency.
+        Indents the element in place with ElementTree.indent and serializes it
+        with the C-accelerated writer instead of a minidom round-trip. The result
+        has no XML declaration and no trailing newline.
+        The exporter renders its own XML from templates and no longer calls
+        this; it stays exported for callers that build element trees.
     """
-    rough_string = ElementTree.tostring(elem, "utf-8")
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    ElementTree.indent(elem, space="  ")
+    return ElementTree.tostring(elem, encoding="unicode")
 
 
 def prettify_xml_str(xml_str: str) -> str:
@@ -328,73 +397,83 @@ def create_ros2_package(urdf_infos: UrdfInfo) -> None:
     shutil.copytree(package_template_dir, package_dir, dirs_exist_ok=True)
 
 
-def update_ros2_package(urdf_infos: UrdfInfo) -> None:
-    """Update ROS 2 package files with the correct package name.
+def _substitute_in_file(file_name: str, substitutions: dict[str, str]) -> None:
+    """Apply several regex substitutions to a template file in a single pass.
+
+    All patterns are combined into one alternation, so the file content is scanned
+    once regardless of how many placeholders are replaced.
 
     Args:
-        urdf_infos: Dictionary containing package_name and package_dir
+        file_name: Path to the file to edit in place
+        substitutions: Mapping of regex pattern to literal replacement text
 
-    This function modifies the CMakeLists.txt and package.xml files in the
-    ROS 2 package to replace template values with the actual package name.
+    Note:
+        Patterns must not overlap and must not contain named groups.
     """
+    replacements = list(substitutions.values())
+    pattern = re.compile(
+        "|".join(f"(?P<s{i}>{p})" for i, p in enumerate(substitutions))
+    )
 
-    # Update setup.py
-    file_name = os.path.join(urdf_infos["package_dir"], "setup.py")
+    def replace(match: re.Match) -> str:
+        # the matched group is named "s<index>" into replacements
+        return replacements[int(str(match.lastgroup)[1:])]
 
     with open(file_name, "r+") as f:
         content = f.read()
-        content = re.sub(r"\${package_name}", f"{urdf_infos['package_name']}", content)
         f.seek(0)
-        f.write(content)
+        f.write(pattern.sub(replace, content))
+        # the result can be shorter than the template, drop any leftover tail
+        f.truncate()
 
-    # Update package.xml
-    file_name = os.path.join(urdf_infos["package_dir"], "package.xml")
 
-    with open(file_name, "r+") as f:
-        content = f.read()
-        f.seek(0)
-        f.write(
-            re.sub(
-                r"<name>.*</name>",
-                f"<name>{urdf_infos['package_name']}</name>",
-                re.sub(
-                    r"<description>.*</description>",
-                    f"<description>The {urdf_infos['package_name']} package</description>",
-                    content,
-                ),
-            )
-        )
+def update_ros2_package(urdf_infos: UrdfInfo) -> None:
+    """Update ROS 2 package files with the correct package name.
+
+    Args:
+        urdf_infos: Dictionary containing package_name and package_dir
+
+    This function modifies the setup.py, setup.cfg, package.xml and launch files
+    in the ROS 2 package to replace template values with the actual package name.
+    """
+    package_dir = urdf_infos["package_dir"]
+    package_name = urdf_infos["package_name"]
+
+    # Update setup.py
+    _substitute_in_file(
+        os.path.join(package_dir, "setup.py"),
+        {r"\${package_name}": package_name},
+    )
+
+    # Update package.xml
+    _substitute_in_file(
+        os.path.join(package_dir, "package.xml"),
+        {
+            r"<name>.*</name>": f"<name>{package_name}</name>",
+            r"<description>.*</description>": (
+                f"<description>The {package_name} package</description>"
+            ),
+        },
+    )
 
     # Update setup.cfg
-    file_name = os.path.join(urdf_infos["package_dir"], "setup.cfg")
-    with open(file_name, "r+") as f:
-        content = f.read()
-        f.seek(0)
-        f.write(
-            re.sub(
-                r"script_dir=\$base/lib/\${package_name}",
-                f"script_dir=$base/lib/{urdf_infos['package_name']}",
-                re.sub(
-                    r"install_scripts=\$base/lib/\${package_name}",
-                    f"install_scripts=$base/lib/{urdf_infos['package_name']}",
-                    content,
-                ),
-            )
-        )
+    _substitute_in_file(
+        os.path.join(package_dir, "setup.cfg"),
+        {
+            r"script_dir=\$base/lib/\${package_name}": (
+                f"script_dir=$base/lib/{package_name}"
+            ),
+            r"install_scripts=\$base/lib/\${package_name}": (
+                f"install_scripts=$base/lib/{package_name}"
+            ),
+        },
+    )
 
     # Update launch file
-    file_name = os.path.join(urdf_infos["package_dir"], "launch", "display.launch.xml")
-
-    with open(file_name, "r+") as f:
-        content = f.read()
-        f.seek(0)
-        f.write(
-            re.sub(
-                r"\${robot_name}",
-                urdf_infos["robot_name"],
-                content,
-            )
-        )
+    _substitute_in_file(
+        os.path.join(package_dir, "launch", "display.launch.xml"),
+        {r"\${robot_name}": urdf_infos["robot_name"]},
+    )
 
 
 def create_ros_package(urdf_infos: UrdfInfo) -> None: